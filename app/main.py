@@ -1,4 +1,6 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from starlette.requests import Request
@@ -9,10 +11,25 @@ from app.services.aws_service import (
     get_daily_cost,
     get_service_cost,
     get_region_cost,
-    get_region_service_breakdown
+    get_region_service_breakdown,
+    generate_mock_data,
+    generate_mock_usage_data,
+    generate_mock_daily_cost,
+    generate_mock_service_cost,
+    generate_mock_region_cost,
+    generate_mock_region_service_breakdown
 )
 from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional
+import asyncio
+import hashlib
+import jinja2
+import orjson
 import os
 import logging
 
@@ -23,21 +40,158 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="AWS Region-wise Billing Dashboard")
+# Cost Explorer error codes that mean the supplied credentials are invalid
+_AUTH_CODES = frozenset({
+    'UnrecognizedClientException',
+    'InvalidClientTokenId',
+    'AuthFailure',
+    'InvalidAccessKeyId',
+    'SignatureDoesNotMatch'
+})
+
+# Request headers carrying the caller's credentials, as raw ASGI header names
+_HDR_ACCESS_KEY = b'x-aws-access-key-id'
+_HDR_SECRET_KEY = b'x-aws-secret-access-key'
+_HDR_USE_DEMO = b'x-use-demo-data'
+
+# Size of the shared pool that runs blocking boto3 calls off the event loop
+BOTO_THREADPOOL_SIZE = 64
+
+class ORJSONResponse(JSONResponse):
+    """JSON response serialized with orjson instead of the stdlib encoder"""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # All handlers offload boto3 work via asyncio.to_thread, which uses the
+    # loop's default executor, so size it once here.
+    executor = ThreadPoolExecutor(max_workers=BOTO_THREADPOOL_SIZE)
+    asyncio.get_running_loop().set_default_executor(executor)
+    yield
+    executor.shutdown(wait=False)
+
+app = FastAPI(
+    title="AWS Region-wise Billing Dashboard",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
+
+# Billing payloads repeat region/service names and compress well
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+@dataclass
+class AwsCreds:
+    access_key: Optional[str]
+    secret_key: Optional[str]
+    use_demo: bool
+
+async def get_creds(request: Request) -> AwsCreds:
+    """Extract AWS credentials and the demo flag from the request headers"""
+    access_key = secret_key = None
+    use_demo = False
+    # ASGI header names arrive lower-cased, so one pass over the raw pairs
+    # replaces three Headers.get() scans that each re-encode the name
+    for name, value in request.scope['headers']:
+        if name == _HDR_ACCESS_KEY:
+            access_key = value.decode('latin-1')
+        elif name == _HDR_SECRET_KEY:
+            secret_key = value.decode('latin-1')
+        elif name == _HDR_USE_DEMO:
+            use_demo = value == b'true'
+    return AwsCreds(access_key=access_key, secret_key=secret_key, use_demo=use_demo)
+
+# Demo builders by endpoint; the ones without a date range take no arguments
+_DEMO_BUILDERS = {
+    'daily-cost': generate_mock_daily_cost,
+    'service-cost': generate_mock_service_cost,
+    'region-cost': generate_mock_region_cost,
+    'region-service-breakdown': generate_mock_region_service_breakdown,
+    'billing': generate_mock_data,
+    'usage': generate_mock_usage_data
+}
+
+@lru_cache(maxsize=64)
+def _cached_demo(endpoint: str, start_date: str, end_date: str):
+    """
+    Demo responses do not depend on credentials, so each one is built once per
+    endpoint and period. Endpoints without a date range key on today's UTC date.
+    Callers must not mutate the returned dict.
+    """
+    builder = _DEMO_BUILDERS[endpoint]
+    if endpoint in ('billing', 'usage'):
+        return builder(start_date, end_date)
+    return builder()
+
+def _today_demo(endpoint: str):
+    # The demo generators date their series by the UTC day, so key on it too
+    today = datetime.now(timezone.utc).date().isoformat()
+    return _cached_demo(endpoint, today, today)
+
+def _conditional_json(request: Request, payload) -> Response:
+    """
+    Serialize the payload with an ETag so dashboard polling can revalidate.
+    Returns an empty 304 when the client's If-None-Match is still current.
+    """
+    body = orjson.dumps(payload)
+    etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    headers = {
+        'ETag': etag,
+        'Cache-Control': 'private, max-age=300',
+        # Responses differ per caller, so caches must key on these headers
+        'Vary': 'x-aws-access-key-id, x-aws-secret-access-key, x-use-demo-data'
+    }
+    if_none_match = request.headers.get('if-none-match', '')
+    if etag in (tag.strip() for tag in if_none_match.split(',')):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type='application/json', headers=headers)
+
+async def _call_aws(request: Request, func, *args, **kwargs):
+    """
+    Runs a blocking aws_service call off the event loop. Failures are raised
+    as HTTPException, mapping Cost Explorer errors to 401/403/500, so they
+    reach the client as a plain error response rather than going through
+    the server's unhandled-exception path.
+    """
+    try:
+        return await asyncio.to_thread(func, *args, **kwargs)
+    except ClientError as e:
+        error = e.response.get('Error', {})
+        error_code = error.get('Code', '')
+        error_msg = error.get('Message', str(e))
+        logger.error(f"AWS ClientError in {request.url.path}: {error_code} - {error_msg}")
+
+        if error_code in _AUTH_CODES:
+            raise HTTPException(status_code=401, detail="Invalid AWS credentials. Please double-check your Access Key and Secret Key.")
+        elif error_code == 'AccessDeniedException':
+            raise HTTPException(status_code=403, detail="Access denied. Your AWS user needs 'ce:GetCostAndUsage' permissions.")
+        else:
+            raise HTTPException(status_code=500, detail=f"AWS error: {error_msg}")
+    except Exception as e:
+        logger.error(f"Error in {request.url.path} endpoint: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
-# Templates
-templates = Jinja2Templates(directory="app/templates")
+# Templates: compiled once and kept for the life of the worker. Jinja's async
+# mode is not enabled because TemplateResponse renders synchronously and
+# async templates would need their own event loop to do so.
+templates = Jinja2Templates(env=jinja2.Environment(
+    loader=jinja2.FileSystemLoader("app/templates"),
+    autoescape=jinja2.select_autoescape(),
+    cache_size=-1,
+    auto_reload=False
+))
 
 @app.get("/")
 async def read_root(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return templates.TemplateResponse(request, "index.html")
 
 @app.get("/help")
 async def read_help(request: Request):
-    return templates.TemplateResponse("help.html", {"request": request})
+    return templates.TemplateResponse(request, "help.html")
 
 @app.get("/health")
 async def health_check():
@@ -46,148 +200,84 @@ async def health_check():
     return {"status": "ok"}
 
 @app.get("/daily-cost")
-async def get_daily_cost_endpoint(request: Request):
+async def get_daily_cost_endpoint(request: Request, refresh: bool = False, creds: AwsCreds = Depends(get_creds)):
     """Get daily cost for the last 7 days"""
-    try:
-        logger.info("Daily cost endpoint called")
-        
-        # Extract credentials from headers
-        access_key = request.headers.get('x-aws-access-key-id')
-        secret_key = request.headers.get('x-aws-secret-access-key')
-        use_demo = request.headers.get('x-use-demo-data') == 'true'
-
-        data = get_daily_cost(
-            access_key=access_key,
-            secret_key=secret_key,
-            force_demo=use_demo
-        )
-        
-        logger.info(f"Daily cost data retrieved successfully: {len(data.get('daily_costs', []))} days")
-        return data
-        
-    except ClientError as e:
-        error_code = e.response.get('Error', {}).get('Code', '')
-        error_msg = e.response.get('Error', {}).get('Message', str(e))
-        logger.error(f"AWS ClientError in daily-cost: {error_code} - {error_msg}")
-        
-        if error_code in ['UnrecognizedClientException', 'InvalidClientTokenId', 'AuthFailure', 'InvalidAccessKeyId', 'SignatureDoesNotMatch']:
-            raise HTTPException(status_code=401, detail="Invalid AWS credentials. Please double-check your Access Key and Secret Key.")
-        elif error_code == 'AccessDeniedException':
-            raise HTTPException(status_code=403, detail="Access denied. Your AWS user needs 'ce:GetCostAndUsage' permissions.")
-        else:
-            raise HTTPException(status_code=500, detail=f"AWS error: {error_msg}")
-            
-    except Exception as e:
-        logger.error(f"Error in daily-cost endpoint: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    if creds.use_demo:
+        return _conditional_json(request, _today_demo('daily-cost'))
+
+    logger.info("Daily cost endpoint called")
+
+    data = await _call_aws(
+        request,
+        get_daily_cost,
+        access_key=creds.access_key,
+        secret_key=creds.secret_key,
+        force_demo=creds.use_demo,
+        force_refresh=refresh
+    )
+
+    logger.info(f"Daily cost data retrieved successfully: {len(data.get('daily_costs', []))} days")
+    return _conditional_json(request, data)
 
 @app.get("/service-cost")
-async def get_service_cost_endpoint(request: Request):
+async def get_service_cost_endpoint(request: Request, refresh: bool = False, creds: AwsCreds = Depends(get_creds)):
     """Get service-wise cost breakdown"""
-    try:
-        logger.info("Service cost endpoint called")
-        
-        # Extract credentials from headers
-        access_key = request.headers.get('x-aws-access-key-id')
-        secret_key = request.headers.get('x-aws-secret-access-key')
-        use_demo = request.headers.get('x-use-demo-data') == 'true'
-
-        data = get_service_cost(
-            access_key=access_key,
-            secret_key=secret_key,
-            force_demo=use_demo
-        )
-        
-        logger.info(f"Service cost data retrieved successfully: {len(data.get('services', {}))} services")
-        return data
-        
-    except ClientError as e:
-        error_code = e.response.get('Error', {}).get('Code', '')
-        error_msg = e.response.get('Error', {}).get('Message', str(e))
-        logger.error(f"AWS ClientError in service-cost: {error_code} - {error_msg}")
-        
-        if error_code in ['UnrecognizedClientException', 'InvalidClientTokenId', 'AuthFailure', 'InvalidAccessKeyId', 'SignatureDoesNotMatch']:
-            raise HTTPException(status_code=401, detail="Invalid AWS credentials. Please double-check your Access Key and Secret Key.")
-        elif error_code == 'AccessDeniedException':
-            raise HTTPException(status_code=403, detail="Access denied. Your AWS user needs 'ce:GetCostAndUsage' permissions.")
-        else:
-            raise HTTPException(status_code=500, detail=f"AWS error: {error_msg}")
-            
-    except Exception as e:
-        logger.error(f"Error in service-cost endpoint: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    if creds.use_demo:
+        return _conditional_json(request, _today_demo('service-cost'))
+
+    logger.info("Service cost endpoint called")
+
+    data = await _call_aws(
+        request,
+        get_service_cost,
+        access_key=creds.access_key,
+        secret_key=creds.secret_key,
+        force_demo=creds.use_demo,
+        force_refresh=refresh
+    )
+
+    logger.info(f"Service cost data retrieved successfully: {len(data.get('services', {}))} services")
+    return _conditional_json(request, data)
 
 @app.get("/region-cost")
-async def get_region_cost_endpoint(request: Request):
+async def get_region_cost_endpoint(request: Request, refresh: bool = False, creds: AwsCreds = Depends(get_creds)):
     """Get region-wise cost breakdown"""
-    try:
-        logger.info("Region cost endpoint called")
-        
-        # Extract credentials from headers
-        access_key = request.headers.get('x-aws-access-key-id')
-        secret_key = request.headers.get('x-aws-secret-access-key')
-        use_demo = request.headers.get('x-use-demo-data') == 'true'
-
-        data = get_region_cost(
-            access_key=access_key,
-            secret_key=secret_key,
-            force_demo=use_demo
-        )
-        
-        logger.info(f"Region cost data retrieved successfully: {len(data.get('regions', {}))} regions")
-        return data
-        
-    except ClientError as e:
-        error_code = e.response.get('Error', {}).get('Code', '')
-        error_msg = e.response.get('Error', {}).get('Message', str(e))
-        logger.error(f"AWS ClientError in region-cost: {error_code} - {error_msg}")
-        
-        if error_code in ['UnrecognizedClientException', 'InvalidClientTokenId', 'AuthFailure', 'InvalidAccessKeyId', 'SignatureDoesNotMatch']:
-            raise HTTPException(status_code=401, detail="Invalid AWS credentials. Please double-check your Access Key and Secret Key.")
-        elif error_code == 'AccessDeniedException':
-            raise HTTPException(status_code=403, detail="Access denied. Your AWS user needs 'ce:GetCostAndUsage' permissions.")
-        else:
-            raise HTTPException(status_code=500, detail=f"AWS error: {error_msg}")
-            
-    except Exception as e:
-        logger.error(f"Error in region-cost endpoint: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    if creds.use_demo:
+        return _conditional_json(request, _today_demo('region-cost'))
+
+    logger.info("Region cost endpoint called")
+
+    data = await _call_aws(
+        request,
+        get_region_cost,
+        access_key=creds.access_key,
+        secret_key=creds.secret_key,
+        force_demo=creds.use_demo,
+        force_refresh=refresh
+    )
+
+    logger.info(f"Region cost data retrieved successfully: {len(data.get('regions', {}))} regions")
+    return _conditional_json(request, data)
 
 @app.get("/region-service-breakdown")
-async def get_region_service_breakdown_endpoint(request: Request):
+async def get_region_service_breakdown_endpoint(request: Request, refresh: bool = False, creds: AwsCreds = Depends(get_creds)):
     """Get region-wise cost breakdown with service details"""
-    try:
-        logger.info("Region-service breakdown endpoint called")
-        
-        # Extract credentials from headers
-        access_key = request.headers.get('x-aws-access-key-id')
-        secret_key = request.headers.get('x-aws-secret-access-key')
-        use_demo = request.headers.get('x-use-demo-data') == 'true'
-
-        data = get_region_service_breakdown(
-            access_key=access_key,
-            secret_key=secret_key,
-            force_demo=use_demo
-        )
-        
-        logger.info(f"Region-service breakdown retrieved successfully: {len(data.get('regions', {}))} regions")
-        return data
-        
-    except ClientError as e:
-        error_code = e.response.get('Error', {}).get('Code', '')
-        error_msg = e.response.get('Error', {}).get('Message', str(e))
-        logger.error(f"AWS ClientError in region-service-breakdown: {error_code} - {error_msg}")
-        
-        if error_code in ['UnrecognizedClientException', 'InvalidClientTokenId', 'AuthFailure', 'InvalidAccessKeyId', 'SignatureDoesNotMatch']:
-            raise HTTPException(status_code=401, detail="Invalid AWS credentials. Please double-check your Access Key and Secret Key.")
-        elif error_code == 'AccessDeniedException':
-            raise HTTPException(status_code=403, detail="Access denied. Your AWS user needs 'ce:GetCostAndUsage' permissions.")
-        else:
-            raise HTTPException(status_code=500, detail=f"AWS error: {error_msg}")
-            
-    except Exception as e:
-        logger.error(f"Error in region-service-breakdown endpoint: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    if creds.use_demo:
+        return _conditional_json(request, _today_demo('region-service-breakdown'))
+
+    logger.info("Region-service breakdown endpoint called")
+
+    data = await _call_aws(
+        request,
+        get_region_service_breakdown,
+        access_key=creds.access_key,
+        secret_key=creds.secret_key,
+        force_demo=creds.use_demo,
+        force_refresh=refresh
+    )
+
+    logger.info(f"Region-service breakdown retrieved successfully: {len(data.get('regions', {}))} regions")
+    return _conditional_json(request, data)
 
 
 @app.get("/api/billing")
@@ -195,79 +285,109 @@ async def get_billing(
     request: Request,
     start_date: str,
     end_date: str,
-    granularity: str = "MONTHLY"
+    granularity: str = "MONTHLY",
+    refresh: bool = False,
+    creds: AwsCreds = Depends(get_creds)
 ):
-    try:
-        # Extract credentials from headers
-        access_key = request.headers.get('x-aws-access-key-id')
-        secret_key = request.headers.get('x-aws-secret-access-key')
-        use_demo = request.headers.get('x-use-demo-data') == 'true'
-
-        data = get_aws_cost_and_usage(
-            start_date, 
-            end_date, 
+    if creds.use_demo:
+        return _conditional_json(request, _cached_demo('billing', start_date, end_date))
+
+    # The two Cost Explorer queries are independent, so issue them together
+    data, daily_data = await asyncio.gather(
+        _call_aws(
+            request,
+            get_aws_cost_and_usage,
+            start_date,
+            end_date,
             granularity,
-            access_key=access_key,
-            secret_key=secret_key,
-            force_demo=use_demo
+            access_key=creds.access_key,
+            secret_key=creds.secret_key,
+            force_demo=creds.use_demo,
+            force_refresh=refresh
+        ),
+        _call_aws(
+            request,
+            get_aws_daily_usage,
+            access_key=creds.access_key,
+            secret_key=creds.secret_key,
+            force_demo=creds.use_demo,
+            force_refresh=refresh
         )
-        
-        # Add daily usage
-        daily_data = get_aws_daily_usage(
-            access_key=access_key,
-            secret_key=secret_key,
-            force_demo=use_demo
-        )
-        data['daily_cost'] = daily_data['daily_cost']
-        
-        return data
-    except ClientError as e:
-        error_code = e.response.get('Error', {}).get('Code', '')
-        error_msg = e.response.get('Error', {}).get('Message', str(e))
-        
-        if error_code in ['UnrecognizedClientException', 'InvalidClientTokenId', 'AuthFailure', 'InvalidAccessKeyId', 'SignatureDoesNotMatch']:
-            raise HTTPException(status_code=401, detail="Invalid AWS credentials. Please double-check your Access Key and Secret Key.")
-        elif error_code == 'AccessDeniedException':
-            raise HTTPException(status_code=403, detail="Access denied. Your AWS user needs 'ce:GetCostAndUsage' permissions to view billing data.")
-        else:
-            raise HTTPException(status_code=500, detail="An unexpected AWS error occurred. Please try again later.")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    )
+    data['daily_cost'] = daily_data['daily_cost']
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return _conditional_json(request, data)
+
+@app.get("/api/bulk")
+async def get_bulk(
+    request: Request,
+    start_date: str,
+    end_date: str,
+    refresh: bool = False,
+    creds: AwsCreds = Depends(get_creds)
+):
+    """
+    Daily, service, region, region-service and usage data in one response,
+    keyed by section, for clients that would otherwise make five requests
+    """
+    if creds.use_demo:
+        return _conditional_json(request, {
+            'daily_cost': _today_demo('daily-cost'),
+            'service_cost': _today_demo('service-cost'),
+            'region_cost': _today_demo('region-cost'),
+            'region_service_breakdown': _today_demo('region-service-breakdown'),
+            'usage': _cached_demo('usage', start_date, end_date)
+        })
+
+    logger.info("Bulk endpoint called")
+
+    aws_args = {
+        'access_key': creds.access_key,
+        'secret_key': creds.secret_key,
+        'force_demo': creds.use_demo,
+        'force_refresh': refresh
+    }
+    # Service, region and breakdown share one Cost Explorer query, so running
+    # them together costs a single request for the three
+    daily, service, region, breakdown, usage = await asyncio.gather(
+        _call_aws(request, get_daily_cost, **aws_args),
+        _call_aws(request, get_service_cost, **aws_args),
+        _call_aws(request, get_region_cost, **aws_args),
+        _call_aws(request, get_region_service_breakdown, **aws_args),
+        _call_aws(request, get_aws_resource_usage, start_date, end_date, **aws_args)
+    )
+
+    return _conditional_json(request, {
+        'daily_cost': daily,
+        'service_cost': service,
+        'region_cost': region,
+        'region_service_breakdown': breakdown,
+        'usage': usage
+    })
 
 @app.get("/usage")
 async def read_usage(request: Request):
-    return templates.TemplateResponse("usage.html", {"request": request})
+    return templates.TemplateResponse(request, "usage.html")
 
 @app.get("/api/usage")
 async def get_usage(
     request: Request,
     start_date: str,
-    end_date: str
+    end_date: str,
+    refresh: bool = False,
+    creds: AwsCreds = Depends(get_creds)
 ):
-    try:
-        # Extract credentials from headers
-        access_key = request.headers.get('x-aws-access-key-id')
-        secret_key = request.headers.get('x-aws-secret-access-key')
-        use_demo = request.headers.get('x-use-demo-data') == 'true'
+    if creds.use_demo:
+        return _conditional_json(request, _cached_demo('usage', start_date, end_date))
 
-        data = get_aws_resource_usage(
-            start_date, 
-            end_date,
-            access_key=access_key,
-            secret_key=secret_key,
-            force_demo=use_demo
-        )
-        return data
-    except ClientError as e:
-        error_code = e.response.get('Error', {}).get('Code', '')
-        if error_code in ['UnrecognizedClientException', 'InvalidClientTokenId', 'AuthFailure', 'InvalidAccessKeyId', 'SignatureDoesNotMatch']:
-            raise HTTPException(status_code=401, detail="Invalid AWS credentials.")
-        elif error_code == 'AccessDeniedException':
-            raise HTTPException(status_code=403, detail="Access denied.")
-        else:
-            raise HTTPException(status_code=500, detail="An unexpected AWS error occurred.")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    data = await _call_aws(
+        request,
+        get_aws_resource_usage,
+        start_date,
+        end_date,
+        access_key=creds.access_key,
+        secret_key=creds.secret_key,
+        force_demo=creds.use_demo,
+        force_refresh=refresh
+    )
+    return _conditional_json(request, data)
@@ -1,8 +1,225 @@
-import boto3
-from botocore.exceptions import ClientError
+import botocore.session
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+from cachetools import LRUCache, TTLCache
+from collections import defaultdict
+from concurrent.futures import Future
+from functools import lru_cache
+import copy
+import hashlib
+import json
+import logging
 import os
 import random
-from datetime import datetime, timedelta
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+# Environment configuration is fixed for the lifetime of the worker process,
+# so it is read once at import instead of on every request.
+_TRUTHY = frozenset({'1', 'true', 'yes', 'on'})
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, '').strip().lower() in _TRUTHY
+
+_USE_DEMO_ENV = _env_flag('USE_DEMO_DATA')
+_FALLBACK_DEMO = _env_flag('FALLBACK_TO_DEMO')
+_ENV_REGION = os.environ.get('AWS_REGION', 'us-east-1')
+
+# Cost Explorer data changes a few times a day at most and every request is
+# billed, so raw responses are kept per credential set and query (time window
+# and grouping) for COST_CACHE_TTL seconds, 15 minutes by default.
+_COST_CACHE_TTL = int(os.environ.get('COST_CACHE_TTL', '900'))
+_cost_cache = TTLCache(maxsize=512, ttl=_COST_CACHE_TTL)
+_cost_cache_lock = threading.Lock()
+# Queries currently being fetched, so concurrent identical ones share a result
+_cost_inflight = {}
+
+# One botocore session for the whole process: it loads and parses the service
+# models once, and every Cost Explorer client below is created from it without
+# going through the boto3 wrapper session.
+_SESSION = botocore.session.get_session()
+_session_lock = threading.Lock()
+
+# Long-lived clients keyed on a hash of the credentials, never the raw keys
+_ce_clients = LRUCache(maxsize=32)
+
+# Shared by every Cost Explorer client: a pool large enough for concurrent
+# dashboard loads, keepalive on idle connections, and adaptive retries so
+# throttling backs off instead of failing the request.
+_BOTO_CONFIG = Config(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    retries={'max_attempts': 10, 'mode': 'adaptive'}
+)
+
+def _credential_hash(access_key: str, secret_key: str):
+    """
+    Identifies a credential set in cache keys without keeping the raw secret.
+    The default credential chain is one identity for the whole process.
+    """
+    if access_key is None:
+        return 'default'
+    return hashlib.sha256(f"{access_key}:{secret_key}".encode()).hexdigest()
+
+# Credentials found on the default chain, kept once found. The chain is
+# walked on its own session and lock, so a slow lookup (the instance metadata
+# probe times out per step) never holds up client creation for requests that
+# bring their own keys. A miss is remembered for _CREDENTIALS_RETRY seconds:
+# long enough that keyless requests do not re-probe on every call, short
+# enough that a lookup which failed at startup is soon tried again.
+_CREDENTIALS_RETRY = 30
+_credentials_session = botocore.session.get_session()
+_credentials_lock = threading.Lock()
+_default_creds = None
+_default_creds_missed_at = None
+
+def _default_credentials():
+    """
+    Credentials from botocore's default chain: environment variables, shared
+    config, or the ECS task / EC2 instance role, or None. Role credentials
+    refresh themselves inside the clients that use them. A broken chain,
+    such as an unknown AWS_PROFILE, counts as no credentials.
+    """
+    global _default_creds, _default_creds_missed_at
+    if _default_creds is not None:
+        return _default_creds
+    with _credentials_lock:
+        recently_missed = (
+            _default_creds_missed_at is not None
+            and time.monotonic() - _default_creds_missed_at < _CREDENTIALS_RETRY
+        )
+        if _default_creds is None and not recently_missed:
+            try:
+                _default_creds = _credentials_session.get_credentials()
+            except BotoCoreError as e:
+                logger.warning("Default AWS credential chain unavailable: %s", e)
+            if _default_creds is None:
+                _default_creds_missed_at = time.monotonic()
+        return _default_creds
+
+def _utc_today():
+    """
+    Cost Explorer days are UTC, so date windows are computed from the UTC date.
+    """
+    return datetime.now(timezone.utc).date()
+
+def _resolve_credentials(access_key: str, secret_key: str):
+    """
+    Returns (access_key, secret_key, region). Without per-request keys both
+    keys are None and clients fall back to the default credential chain.
+    """
+    if access_key and secret_key:
+        return access_key, secret_key, _ENV_REGION
+    return None, None, _ENV_REGION
+
+# How a request is served, keyed on (force_demo, keys sent with the request,
+# credentials available from the request or the default chain). The frontend's demo toggle
+# always wins; USE_DEMO_DATA applies only when the request brings no keys of
+# its own; with no keys at all, FALLBACK_TO_DEMO decides between demo data
+# and an error. The env flags are fixed at import, so the table is too.
+_DEMO, _AWS, _MISSING = 'demo', 'aws', 'missing'
+_NO_KEYS = _DEMO if _FALLBACK_DEMO else _MISSING
+_MODES = {
+    (True, False, False): _DEMO,
+    (True, False, True): _DEMO,
+    (True, True, False): _DEMO,
+    (True, True, True): _DEMO,
+    (False, False, False): _DEMO if _USE_DEMO_ENV else _NO_KEYS,
+    (False, False, True): _DEMO if _USE_DEMO_ENV else _AWS,
+    (False, True, False): _NO_KEYS,
+    (False, True, True): _AWS
+}
+
+def _resolve_mode(access_key: str, secret_key: str, force_demo: bool):
+    """
+    Returns (mode, credentials) for a request, where mode is one of _DEMO,
+    _AWS or _MISSING and credentials is (access_key, secret_key, region).
+    """
+    credentials = _resolve_credentials(access_key, secret_key)
+    has_direct_credentials = access_key is not None and secret_key is not None
+    row = (bool(force_demo), has_direct_credentials)
+    mode = _MODES[row + (False,)]
+    # The default chain can be slow or broken, so it is only consulted when
+    # the answer depends on it
+    if mode != _MODES[row + (True,)]:
+        has_credentials = credentials[0] is not None or _default_credentials() is not None
+        mode = _MODES[row + (has_credentials,)]
+    return mode, credentials
+
+def _get_ce_client(access_key: str, secret_key: str, region: str):
+    """
+    Returns a long-lived Cost Explorer client for the given credentials, or
+    for the default credential chain when both keys are None.
+    Clients are thread-safe, so reusing one keeps the service model loaded
+    and the HTTPS connection pool warm across requests.
+    """
+    key = (_credential_hash(access_key, secret_key), region)
+    # Sessions are not thread-safe, so client creation is serialized
+    with _session_lock:
+        client = _ce_clients.get(key)
+        if client is None:
+            client = _SESSION.create_client(
+                'ce',
+                aws_access_key_id=access_key,
+                aws_secret_access_key=secret_key,
+                region_name=region,
+                config=_BOTO_CONFIG
+            )
+            _ce_clients[key] = client
+        return client
+
+def _query_cost_and_usage(access_key: str, secret_key: str, region: str, force_refresh: bool = False, **query):
+    """
+    Runs a GetCostAndUsage query, serving repeats from the in-memory TTL cache.
+    Concurrent callers asking for the same uncached query wait on the one
+    request already in flight instead of each sending their own.
+    Only successful responses are cached. force_refresh skips the cache
+    lookup; the fresh response still replaces the cached one.
+    """
+    key = (_credential_hash(access_key, secret_key), region, json.dumps(query, sort_keys=True))
+    with _cost_cache_lock:
+        response = None if force_refresh else _cost_cache.get(key)
+        if response is not None:
+            return response
+        pending = _cost_inflight.get(key)
+        if pending is None:
+            pending = _cost_inflight[key] = Future()
+            owner = True
+        else:
+            owner = False
+
+    if not owner:
+        return pending.result()
+
+    try:
+        client = _get_ce_client(access_key, secret_key, region)
+        response = client.get_cost_and_usage(**query)
+    except BaseException as e:
+        with _cost_cache_lock:
+            _cost_inflight.pop(key, None)
+        pending.set_exception(e)
+        raise
+    with _cost_cache_lock:
+        _cost_cache[key] = response
+        _cost_inflight.pop(key, None)
+    pending.set_result(response)
+    return response
+
+def _iter_cost_and_usage_pages(access_key: str, secret_key: str, region: str, force_refresh: bool = False, **query):
+    """
+    Yields every page of a GetCostAndUsage query by following NextPageToken.
+    Pages are fetched lazily, so callers can aggregate one page at a time.
+    """
+    while True:
+        page = _query_cost_and_usage(access_key, secret_key, region, force_refresh, **query)
+        yield page
+        token = page.get('NextPageToken')
+        if not token:
+            return
+        query['NextPageToken'] = token
 
 def get_aws_cost_and_usage(
     start_date: str, 
@@ -10,48 +227,31 @@ def get_aws_cost_and_usage(
     granularity: str = "MONTHLY",
     access_key: str = None,
     secret_key: str = None,
-    force_demo: bool = False
+    force_demo: bool = False,
+    force_refresh: bool = False
 ):
     """
     Fetches cost and usage data from AWS Cost Explorer, grouped by Region and Service.
     Returns a structured dict with 'regions' (for nested view) and 'consolidated' (service-level total).
     """
     
-    # If explicitly forced by frontend, use demo data
-    if force_demo:
+    mode, credentials = _resolve_mode(access_key, secret_key, force_demo)
+    if mode == _DEMO:
         return generate_mock_data(start_date, end_date)
-
-    # Resolve credentials passed directly
-    has_direct_credentials = access_key is not None and secret_key is not None
-
-    # Determine if we should use demo data from env (ONLY if no credentials provided)
-    use_demo_env = os.environ.get('USE_DEMO_DATA', 'false').lower() == 'true'
-    
-    if not has_direct_credentials and use_demo_env:
-        return generate_mock_data(start_date, end_date)
-
-    # Resolve credentials
-    final_access_key = access_key or os.environ.get('AWS_ACCESS_KEY_ID')
-    final_secret_key = secret_key or os.environ.get('AWS_SECRET_ACCESS_KEY')
-    final_region = os.environ.get('AWS_REGION', 'us-east-1')
-
-    if not final_access_key or not final_secret_key:
-         if os.environ.get('FALLBACK_TO_DEMO', 'false').lower() == 'true':
-             return generate_mock_data(start_date, end_date)
-         raise Exception("AWS Credentials not provided and demo mode not active.")
+    if mode == _MISSING:
+        raise Exception("AWS Credentials not provided and demo mode not active.")
+    final_access_key, final_secret_key, final_region = credentials
 
     try:
-        client = boto3.client(
-            'ce',
-            aws_access_key_id=final_access_key,
-            aws_secret_access_key=final_secret_key,
-            region_name=final_region
-        )
-
         # distinct calls might be needed for perfect strict region grouping vs service grouping,
         # but CostExplorer supports multi-level grouping.
         # GroupBy: Region, Service
-        response = client.get_cost_and_usage(
+        # Cost Explorer caps the groups per response, so follow NextPageToken
+        pages = _iter_cost_and_usage_pages(
+            final_access_key,
+            final_secret_key,
+            final_region,
+            force_refresh,
             TimePeriod={
                 'Start': start_date,
                 'End': end_date
@@ -63,20 +263,34 @@ def get_aws_cost_and_usage(
                 {'Type': 'DIMENSION', 'Key': 'SERVICE'}
             ]
         )
-        return format_aws_response_detailed(response)
+        return format_aws_response_detailed(pages)
 
     except (ClientError, Exception) as e:
-        print(f"Error fetching data from AWS: {e}")
-        if os.environ.get('FALLBACK_TO_DEMO', 'false').lower() == 'true':
+        logger.exception("Error fetching data from AWS: %s", e)
+        if _FALLBACK_DEMO:
              return generate_mock_data(start_date, end_date)
         raise e
 
-def format_aws_response_detailed(response):
+def _iter_results_by_time(pages, period):
     """
-    Formats the boto3 response into a structured JSON for the frontend.
+    Yields every ResultsByTime entry across the pages, recording the first
+    start and last end date seen in period. Later pages may repeat the last
+    period with its remaining groups, so the end is read from every page.
+    """
+    for page in pages:
+        results_by_time = page.get('ResultsByTime', [])
+        if not results_by_time:
+            continue
+        if not period['start']:
+            period['start'] = results_by_time[0]['TimePeriod']['Start']
+        period['end'] = results_by_time[-1]['TimePeriod']['End']
+        yield from results_by_time
+
+def format_aws_response_detailed(pages):
+    """
+    Formats the pages of a boto3 response into a structured JSON for the frontend.
+    Each page is folded into the grouped sums as it arrives.
     """
-    results_by_time = response.get('ResultsByTime', [])
-    
     formatted_data = {
         'total_cost': 0.0,
         'regions': {},       # { "us-east-1": { "total": X, "services": { "EC2": Y } } }
@@ -84,59 +298,96 @@ def format_aws_response_detailed(response):
         'period': {'start': '', 'end': ''}
     }
 
-    if not results_by_time:
-        return formatted_data
-    
-    formatted_data['period']['start'] = results_by_time[0]['TimePeriod']['Start']
-    formatted_data['period']['end'] = results_by_time[-1]['TimePeriod']['End']
-
-    for result in results_by_time:
-        groups = result.get('Groups', [])
-        for group in groups:
-            # keys are [Region, Service] because of the GroupBy order
-            keys = group['Keys']
-            region = keys[0]
-            service = keys[1] if len(keys) > 1 else "Unknown"
-            
-            amount = float(group['Metrics']['AmortizedCost']['Amount'])
-            
-            # --- Region Structure ---
-            if region not in formatted_data['regions']:
-                formatted_data['regions'][region] = {'total': 0.0, 'services': {}}
-            
-            formatted_data['regions'][region]['total'] += amount
-            if service not in formatted_data['regions'][region]['services']:
-                 formatted_data['regions'][region]['services'][service] = 0.0
-            formatted_data['regions'][region]['services'][service] += amount
-
-            # --- Consolidated Structure ---
-            if service not in formatted_data['consolidated']:
-                formatted_data['consolidated'][service] = {'total': 0.0}
-            
-            formatted_data['consolidated'][service]['total'] += amount
-            
-            formatted_data['total_cost'] += amount
-
-    # Rounding
-    formatted_data['total_cost'] = round(formatted_data['total_cost'], 2)
-    
-    for r_key, r_val in formatted_data['regions'].items():
-        r_val['total'] = round(r_val['total'], 2)
-        for s_key, s_val in r_val['services'].items():
-            r_val['services'][s_key] = round(s_val, 2)
-            
-    for c_key, c_val in formatted_data['consolidated'].items():
-        c_val['total'] = round(c_val['total'], 2)
+    # Group by (region, service) once; the nested views are then built from
+    # the grouped sums, which is much smaller than one row per time period.
+    grouped = defaultdict(float)
+    # Local binding skips the builtins lookup per group; the other aggregation
+    # loops over Cost Explorer groups in this module do the same
+    to_float = float
+    # keys are [Region, Service] because of the GroupBy order
+    rows = (
+        (
+            group['Keys'][0],
+            group['Keys'][1] if len(group['Keys']) > 1 else "Unknown",
+            to_float(group['Metrics']['AmortizedCost']['Amount'])
+        )
+        for result in _iter_results_by_time(pages, formatted_data['period'])
+        for group in result.get('Groups', [])
+    )
+    for region, service, amount in rows:
+        grouped[(region, service)] += amount
+
+    # Totals are summed at full precision; values are rounded only as the
+    # nested output is built, so there is no second pass over it.
+    region_totals = defaultdict(float)
+    service_totals = defaultdict(float)
+    region_services = defaultdict(dict)
+    for (region, service), amount in grouped.items():
+        region_totals[region] += amount
+        service_totals[service] += amount
+        region_services[region][service] = round(amount, 2)
+
+    formatted_data['regions'] = {
+        region: {'total': round(total, 2), 'services': region_services[region]}
+        for region, total in region_totals.items()
+    }
+    formatted_data['consolidated'] = {
+        service: {'total': round(total, 2)}
+        for service, total in service_totals.items()
+    }
+    formatted_data['total_cost'] = round(sum(region_totals.values()), 2)
 
     return formatted_data
 
+# Fixed scaffolding for the demo generators, built once at import; only the
+# random figures are drawn per call.
+_MOCK_REGIONS = ('us-east-1', 'us-west-2', 'eu-west-1', 'ap-southeast-1', 'sa-east-1')
+_MOCK_BREAKDOWN_REGIONS = ('us-east-1', 'us-west-2', 'eu-west-1', 'ap-southeast-1', 'ap-northeast-1', 'eu-central-1')
+_MOCK_USAGE_REGIONS = ('us-east-1', 'us-west-2', 'eu-west-1')
+_MOCK_SERVICES = ('Amazon EC2', 'Amazon RDS', 'Amazon S3', 'AWS Lambda', 'Amazon CloudFront')
+
+# (component, unit) pairs per service
+_MOCK_USAGE_COMPONENTS = {
+    service: tuple((comp, "Units" if "GB" not in comp else "GB") for comp in components)
+    for service, components in {
+        'Amazon EC2': ['t3.medium', 't3.large', 'm5.xlarge', 'EBS:VolumeUsage (GB)'],
+        'Amazon RDS': ['db.t3.small', 'db.m5.large', 'Storage (GB)'],
+        'Amazon S3': ['StandardStorage (GB)', 'Requests-Tier1', 'DataTransfer-Out (GB)'],
+        'AWS Lambda': ['Invocations', 'Duration (GB-Seconds)']
+    }.items()
+}
+
+# (name, low, high) cost ranges for the flat service and region views
+_MOCK_SERVICE_COST_RANGES = (
+    ('Amazon EC2', 100, 500),
+    ('Amazon RDS', 50, 300),
+    ('Amazon S3', 20, 150),
+    ('AWS Lambda', 10, 100),
+    ('Amazon CloudFront', 30, 200),
+    ('Amazon DynamoDB', 15, 120),
+    ('Amazon VPC', 5, 50)
+)
+_MOCK_REGION_COST_RANGES = (
+    ('us-east-1', 200, 600),
+    ('us-west-2', 150, 400),
+    ('eu-west-1', 100, 350),
+    ('ap-southeast-1', 80, 250),
+    ('ap-northeast-1', 60, 200),
+    ('eu-central-1', 50, 180)
+)
+
 def generate_mock_data(start_date, end_date):
+    """
+    Returns demo billing data for the period. Figures are generated once per
+    period and copied on each call, so callers are free to mutate the result.
+    """
+    return copy.deepcopy(_generate_mock_data_cached(start_date, end_date))
+
+@lru_cache(maxsize=64)
+def _generate_mock_data_cached(start_date, end_date):
     """
     Generates realistic looking mock data for demonstration purposes with Service detail.
     """
-    regions = ['us-east-1', 'us-west-2', 'eu-west-1', 'ap-southeast-1', 'sa-east-1']
-    services = ['Amazon EC2', 'Amazon RDS', 'Amazon S3', 'AWS Lambda', 'Amazon CloudFront']
-    
     data = {
         'total_cost': 0.0,
         'regions': {},
@@ -144,16 +395,15 @@ def generate_mock_data(start_date, end_date):
         'period': {'start': start_date, 'end': end_date}
     }
     total = 0
-    for region in regions:
+    service_totals = defaultdict(float)
+    for region in _MOCK_REGIONS:
         region_total = 0
         region_services = {}
-        for service in services:
+        for service in _MOCK_SERVICES:
             cost = round(random.uniform(10, 500), 2)
             region_services[service] = cost
             region_total += cost
-            if service not in data['consolidated']:
-                 data['consolidated'][service] = {'total': 0.0}
-            data['consolidated'][service]['total'] += cost
+            service_totals[service] += cost
         data['regions'][region] = {
             'total': round(region_total, 2),
             'services': region_services
@@ -162,61 +412,58 @@ def generate_mock_data(start_date, end_date):
         
     data['total_cost'] = round(total, 2)
     data['daily_cost'] = round(random.uniform(10, 50), 2)
-    
-    # Round consolidated
-    for service in data['consolidated']:
-        data['consolidated'][service]['total'] = round(data['consolidated'][service]['total'], 2)
+    # Rounded as the output is built rather than in a second pass over it
+    data['consolidated'] = {
+        service: {'total': round(amount, 2)}
+        for service, amount in service_totals.items()
+    }
         
     return data
 
+def _get_last_week_daily(access_key: str, secret_key: str, region: str, force_refresh: bool = False):
+    """
+    Returns the daily results for the last 7 complete days. Both cost metrics
+    are requested so the daily chart (UnblendedCost) and the latest-day figure
+    (AmortizedCost) are read from the same query, which the response cache
+    then serves to whichever of them asks second.
+    """
+    today = _utc_today()
+    start = (today - timedelta(days=7)).isoformat()
+    end = today.isoformat()
+
+    pages = _iter_cost_and_usage_pages(
+        access_key,
+        secret_key,
+        region,
+        force_refresh,
+        TimePeriod={
+            'Start': start,
+            'End': end
+        },
+        Granularity='DAILY',
+        Metrics=['UnblendedCost', 'AmortizedCost']
+    )
+    return [result for page in pages for result in page.get('ResultsByTime', [])]
+
 def get_aws_daily_usage(
     access_key: str = None,
     secret_key: str = None,
-    force_demo: bool = False
+    force_demo: bool = False,
+    force_refresh: bool = False
 ):
     """
     Fetches the cost for the most recent complete day.
     """
-    if force_demo:
+    mode, credentials = _resolve_mode(access_key, secret_key, force_demo)
+    if mode == _DEMO:
         return {"daily_cost": round(random.uniform(5, 30), 2)}
-
-    # Resolve credentials
-    final_access_key = access_key or os.environ.get('AWS_ACCESS_KEY_ID')
-    final_secret_key = secret_key or os.environ.get('AWS_SECRET_ACCESS_KEY')
-    final_region = os.environ.get('AWS_REGION', 'us-east-1')
-
-    if not final_access_key or not final_secret_key:
-         if os.environ.get('FALLBACK_TO_DEMO', 'false').lower() == 'true':
-             return {"daily_cost": round(random.uniform(5, 30), 2)}
-         raise Exception("AWS Credentials not provided.")
+    if mode == _MISSING:
+        raise Exception("AWS Credentials not provided.")
+    final_access_key, final_secret_key, final_region = credentials
 
     try:
-        client = boto3.client(
-            'ce',
-            aws_access_key_id=final_access_key,
-            aws_secret_access_key=final_secret_key,
-            region_name=final_region
-        )
-
-        # Get last 2 days to ensure we have a complete "yesterday"
-        today = datetime.now()
-        yesterday = today - timedelta(days=1)
-        day_before = today - timedelta(days=2)
-        
-        start = day_before.strftime('%Y-%m-%d')
-        end = today.strftime('%Y-%m-%d')
-
-        response = client.get_cost_and_usage(
-            TimePeriod={
-                'Start': start,
-                'End': end
-            },
-            Granularity='DAILY',
-            Metrics=['AmortizedCost']
-        )
-        
-        # Get the latest result
-        results = response.get('ResultsByTime', [])
+        # The last day of the week window is the latest complete day
+        results = _get_last_week_daily(final_access_key, final_secret_key, final_region, force_refresh)
         if results:
             latest = results[-1]
             amount = float(latest.get('Total', {}).get('AmortizedCost', {}).get('Amount', 0.0))
@@ -225,62 +472,32 @@ def get_aws_daily_usage(
         return {"daily_cost": 0.0}
 
     except Exception as e:
-        print(f"Error fetching daily cost: {e}")
-        if os.environ.get('FALLBACK_TO_DEMO', 'false').lower() == 'true':
+        logger.exception("Error fetching daily cost: %s", e)
+        if _FALLBACK_DEMO:
              return {"daily_cost": round(random.uniform(5, 30), 2)}
         raise e
 
 def get_daily_cost(
     access_key: str = None,
     secret_key: str = None,
-    force_demo: bool = False
+    force_demo: bool = False,
+    force_refresh: bool = False
 ):
     """
     Fetches daily cost for the last 7 days from AWS Cost Explorer.
     Returns array of {date, cost} objects.
     """
-    if force_demo:
+    mode, credentials = _resolve_mode(access_key, secret_key, force_demo)
+    if mode == _DEMO:
         return generate_mock_daily_cost()
-
-    # Resolve credentials
-    final_access_key = access_key or os.environ.get('AWS_ACCESS_KEY_ID')
-    final_secret_key = secret_key or os.environ.get('AWS_SECRET_ACCESS_KEY')
-    final_region = os.environ.get('AWS_REGION', 'us-east-1')
-
-    if not final_access_key or not final_secret_key:
-        if os.environ.get('FALLBACK_TO_DEMO', 'false').lower() == 'true':
-            return generate_mock_daily_cost()
+    if mode == _MISSING:
         raise Exception("AWS Credentials not provided.")
+    final_access_key, final_secret_key, final_region = credentials
 
     try:
-        client = boto3.client(
-            'ce',
-            aws_access_key_id=final_access_key,
-            aws_secret_access_key=final_secret_key,
-            region_name=final_region
-        )
-
-        # Get last 7 days
-        today = datetime.now()
-        end_date = today
-        start_date = today - timedelta(days=7)
-        
-        start = start_date.strftime('%Y-%m-%d')
-        end = end_date.strftime('%Y-%m-%d')
-
-        response = client.get_cost_and_usage(
-            TimePeriod={
-                'Start': start,
-                'End': end
-            },
-            Granularity='DAILY',
-            Metrics=['UnblendedCost']
-        )
-        
         # Format response
         daily_costs = []
-        results = response.get('ResultsByTime', [])
-        for result in results:
+        for result in _get_last_week_daily(final_access_key, final_secret_key, final_region, force_refresh):
             date = result['TimePeriod']['Start']
             amount = float(result.get('Total', {}).get('UnblendedCost', {}).get('Amount', 0.0))
             daily_costs.append({
@@ -291,253 +508,161 @@ def get_daily_cost(
         return {'daily_costs': daily_costs}
 
     except Exception as e:
-        print(f"Error fetching daily cost: {e}")
-        if os.environ.get('FALLBACK_TO_DEMO', 'false').lower() == 'true':
+        logger.exception("Error fetching daily cost: %s", e)
+        if _FALLBACK_DEMO:
             return generate_mock_daily_cost()
         raise e
 
+def _get_current_month_breakdown(access_key: str, secret_key: str, region: str, force_refresh: bool = False):
+    """
+    Sums the current month's cost per (region, service) from a single
+    REGION+SERVICE query. The service, region and region-service views are
+    all projected from these sums, so a dashboard load costs one Cost Explorer
+    request instead of three (repeats are served from the response cache).
+    """
+    today = _utc_today()
+    start = today.replace(day=1).isoformat()
+    end = today.isoformat()
+
+    pages = _iter_cost_and_usage_pages(
+        access_key,
+        secret_key,
+        region,
+        force_refresh,
+        TimePeriod={
+            'Start': start,
+            'End': end
+        },
+        Granularity='MONTHLY',
+        Metrics=['UnblendedCost'],
+        GroupBy=[
+            {'Type': 'DIMENSION', 'Key': 'REGION'},
+            {'Type': 'DIMENSION', 'Key': 'SERVICE'}
+        ]
+    )
+
+    grouped = defaultdict(float)
+    to_float = float
+    for page in pages:
+        for result in page.get('ResultsByTime', []):
+            for group in result.get('Groups', []):
+                keys = group['Keys']
+                service = keys[1] if len(keys) > 1 else 'Unknown'
+                grouped[(keys[0], service)] += to_float(group['Metrics']['UnblendedCost']['Amount'])
+    return grouped
+
 def get_service_cost(
     access_key: str = None,
     secret_key: str = None,
-    force_demo: bool = False
+    force_demo: bool = False,
+    force_refresh: bool = False
 ):
     """
     Fetches service-wise cost breakdown from AWS Cost Explorer.
     Returns service-wise cost data.
     """
-    if force_demo:
+    mode, credentials = _resolve_mode(access_key, secret_key, force_demo)
+    if mode == _DEMO:
         return generate_mock_service_cost()
-
-    # Resolve credentials
-    final_access_key = access_key or os.environ.get('AWS_ACCESS_KEY_ID')
-    final_secret_key = secret_key or os.environ.get('AWS_SECRET_ACCESS_KEY')
-    final_region = os.environ.get('AWS_REGION', 'us-east-1')
-
-    if not final_access_key or not final_secret_key:
-        if os.environ.get('FALLBACK_TO_DEMO', 'false').lower() == 'true':
-            return generate_mock_service_cost()
+    if mode == _MISSING:
         raise Exception("AWS Credentials not provided.")
+    final_access_key, final_secret_key, final_region = credentials
 
     try:
-        client = boto3.client(
-            'ce',
-            aws_access_key_id=final_access_key,
-            aws_secret_access_key=final_secret_key,
-            region_name=final_region
-        )
+        grouped = _get_current_month_breakdown(final_access_key, final_secret_key, final_region, force_refresh)
 
-        # Get current month
-        today = datetime.now()
-        start_date = datetime(today.year, today.month, 1)
-        end_date = today
-        
-        start = start_date.strftime('%Y-%m-%d')
-        end = end_date.strftime('%Y-%m-%d')
+        # Fold the region dimension away
+        services = defaultdict(float)
+        for (_, service), amount in grouped.items():
+            services[service] += amount
 
-        response = client.get_cost_and_usage(
-            TimePeriod={
-                'Start': start,
-                'End': end
-            },
-            Granularity='MONTHLY',
-            Metrics=['UnblendedCost'],
-            GroupBy=[
-                {'Type': 'DIMENSION', 'Key': 'SERVICE'}
-            ]
-        )
-        
-        # Format response
-        services = {}
-        total_cost = 0.0
-        
-        results = response.get('ResultsByTime', [])
-        for result in results:
-            for group in result.get('Groups', []):
-                service = group['Keys'][0]
-                amount = float(group['Metrics']['UnblendedCost']['Amount'])
-                
-                if service not in services:
-                    services[service] = 0.0
-                services[service] += amount
-                total_cost += amount
-        
-        # Round values
-        for service in services:
-            services[service] = round(services[service], 2)
-        
         return {
-            'services': services,
-            'total_cost': round(total_cost, 2)
+            'services': {service: round(amount, 2) for service, amount in services.items()},
+            'total_cost': round(sum(services.values()), 2)
         }
 
     except Exception as e:
-        print(f"Error fetching service cost: {e}")
-        if os.environ.get('FALLBACK_TO_DEMO', 'false').lower() == 'true':
+        logger.exception("Error fetching service cost: %s", e)
+        if _FALLBACK_DEMO:
             return generate_mock_service_cost()
         raise e
 
 def get_region_cost(
     access_key: str = None,
     secret_key: str = None,
-    force_demo: bool = False
+    force_demo: bool = False,
+    force_refresh: bool = False
 ):
     """
     Fetches region-wise cost breakdown from AWS Cost Explorer.
     Returns region-wise cost data.
     """
-    if force_demo:
+    mode, credentials = _resolve_mode(access_key, secret_key, force_demo)
+    if mode == _DEMO:
         return generate_mock_region_cost()
-
-    # Resolve credentials
-    final_access_key = access_key or os.environ.get('AWS_ACCESS_KEY_ID')
-    final_secret_key = secret_key or os.environ.get('AWS_SECRET_ACCESS_KEY')
-    final_region = os.environ.get('AWS_REGION', 'us-east-1')
-
-    if not final_access_key or not final_secret_key:
-        if os.environ.get('FALLBACK_TO_DEMO', 'false').lower() == 'true':
-            return generate_mock_region_cost()
+    if mode == _MISSING:
         raise Exception("AWS Credentials not provided.")
+    final_access_key, final_secret_key, final_region = credentials
 
     try:
-        client = boto3.client(
-            'ce',
-            aws_access_key_id=final_access_key,
-            aws_secret_access_key=final_secret_key,
-            region_name=final_region
-        )
+        grouped = _get_current_month_breakdown(final_access_key, final_secret_key, final_region, force_refresh)
 
-        # Get current month
-        today = datetime.now()
-        start_date = datetime(today.year, today.month, 1)
-        end_date = today
-        
-        start = start_date.strftime('%Y-%m-%d')
-        end = end_date.strftime('%Y-%m-%d')
+        # Fold the service dimension away
+        regions = defaultdict(float)
+        for (region, _), amount in grouped.items():
+            regions[region] += amount
 
-        response = client.get_cost_and_usage(
-            TimePeriod={
-                'Start': start,
-                'End': end
-            },
-            Granularity='MONTHLY',
-            Metrics=['UnblendedCost'],
-            GroupBy=[
-                {'Type': 'DIMENSION', 'Key': 'REGION'}
-            ]
-        )
-        
-        # Format response
-        regions = {}
-        total_cost = 0.0
-        
-        results = response.get('ResultsByTime', [])
-        for result in results:
-            for group in result.get('Groups', []):
-                region = group['Keys'][0]
-                amount = float(group['Metrics']['UnblendedCost']['Amount'])
-                
-                if region not in regions:
-                    regions[region] = 0.0
-                regions[region] += amount
-                total_cost += amount
-        
-        # Round values
-        for region in regions:
-            regions[region] = round(regions[region], 2)
-        
         return {
-            'regions': regions,
-            'total_cost': round(total_cost, 2)
+            'regions': {region: round(amount, 2) for region, amount in regions.items()},
+            'total_cost': round(sum(regions.values()), 2)
         }
 
     except Exception as e:
-        print(f"Error fetching region cost: {e}")
-        if os.environ.get('FALLBACK_TO_DEMO', 'false').lower() == 'true':
+        logger.exception("Error fetching region cost: %s", e)
+        if _FALLBACK_DEMO:
             return generate_mock_region_cost()
         raise e
 
 def get_region_service_breakdown(
     access_key: str = None,
     secret_key: str = None,
-    force_demo: bool = False
+    force_demo: bool = False,
+    force_refresh: bool = False
 ):
     """
     Fetches region-wise cost breakdown with service details from AWS Cost Explorer.
     Returns nested structure: regions -> services -> costs
     """
-    if force_demo:
+    mode, credentials = _resolve_mode(access_key, secret_key, force_demo)
+    if mode == _DEMO:
         return generate_mock_region_service_breakdown()
-
-    # Resolve credentials
-    final_access_key = access_key or os.environ.get('AWS_ACCESS_KEY_ID')
-    final_secret_key = secret_key or os.environ.get('AWS_SECRET_ACCESS_KEY')
-    final_region = os.environ.get('AWS_REGION', 'us-east-1')
-
-    if not final_access_key or not final_secret_key:
-        if os.environ.get('FALLBACK_TO_DEMO', 'false').lower() == 'true':
-            return generate_mock_region_service_breakdown()
+    if mode == _MISSING:
         raise Exception("AWS Credentials not provided.")
+    final_access_key, final_secret_key, final_region = credentials
 
     try:
-        client = boto3.client(
-            'ce',
-            aws_access_key_id=final_access_key,
-            aws_secret_access_key=final_secret_key,
-            region_name=final_region
-        )
+        grouped = _get_current_month_breakdown(final_access_key, final_secret_key, final_region, force_refresh)
 
-        # Get current month
-        today = datetime.now()
-        start_date = datetime(today.year, today.month, 1)
-        end_date = today
-        
-        start = start_date.strftime('%Y-%m-%d')
-        end = end_date.strftime('%Y-%m-%d')
+        # Build the nested view once from the flat (region, service) sums
+        region_totals = defaultdict(float)
+        for (region, _), amount in grouped.items():
+            region_totals[region] += amount
 
-        response = client.get_cost_and_usage(
-            TimePeriod={
-                'Start': start,
-                'End': end
-            },
-            Granularity='MONTHLY',
-            Metrics=['UnblendedCost'],
-            GroupBy=[
-                {'Type': 'DIMENSION', 'Key': 'REGION'},
-                {'Type': 'DIMENSION', 'Key': 'SERVICE'}
-            ]
-        )
-        
-        # Format response
-        regions = {}
-        total_cost = 0.0
-        
-        results = response.get('ResultsByTime', [])
-        for result in results:
-            for group in result.get('Groups', []):
-                keys = group['Keys']
-                region = keys[0]
-                service = keys[1] if len(keys) > 1 else 'Unknown'
-                amount = float(group['Metrics']['UnblendedCost']['Amount'])
-                
-                if region not in regions:
-                    regions[region] = {'total': 0.0, 'services': {}}
-                
-                regions[region]['total'] += amount
-                regions[region]['services'][service] = round(amount, 2)
-                total_cost += amount
-        
-        # Round region totals
-        for region in regions:
-            regions[region]['total'] = round(regions[region]['total'], 2)
+        regions = {
+            region: {'total': round(total, 2), 'services': {}}
+            for region, total in region_totals.items()
+        }
+        for (region, service), amount in grouped.items():
+            regions[region]['services'][service] = round(amount, 2)
         
         return {
             'regions': regions,
-            'total_cost': round(total_cost, 2)
+            'total_cost': round(sum(region_totals.values()), 2)
         }
 
     except Exception as e:
-        print(f"Error fetching region-service breakdown: {e}")
-        if os.environ.get('FALLBACK_TO_DEMO', 'false').lower() == 'true':
+        logger.exception("Error fetching region-service breakdown: %s", e)
+        if _FALLBACK_DEMO:
             return generate_mock_region_service_breakdown()
         raise e
 
@@ -547,33 +672,25 @@ def get_aws_resource_usage(
     end_date: str, 
     access_key: str = None,
     secret_key: str = None,
-    force_demo: bool = False
+    force_demo: bool = False,
+    force_refresh: bool = False
 ):
     """
     Fetches resource usage data from AWS Cost Explorer.
     """
-    if force_demo:
+    mode, credentials = _resolve_mode(access_key, secret_key, force_demo)
+    if mode == _DEMO:
         return generate_mock_usage_data(start_date, end_date)
-
-    # Resolve credentials
-    final_access_key = access_key or os.environ.get('AWS_ACCESS_KEY_ID')
-    final_secret_key = secret_key or os.environ.get('AWS_SECRET_ACCESS_KEY')
-    final_region = os.environ.get('AWS_REGION', 'us-east-1')
-
-    if not final_access_key or not final_secret_key:
-         if os.environ.get('FALLBACK_TO_DEMO', 'false').lower() == 'true':
-             return generate_mock_usage_data(start_date, end_date)
-         raise Exception("AWS Credentials not provided and demo mode not active.")
+    if mode == _MISSING:
+        raise Exception("AWS Credentials not provided and demo mode not active.")
+    final_access_key, final_secret_key, final_region = credentials
 
     try:
-        client = boto3.client(
-            'ce',
-            aws_access_key_id=final_access_key,
-            aws_secret_access_key=final_secret_key,
-            region_name=final_region
-        )
-
-        response = client.get_cost_and_usage(
+        pages = _iter_cost_and_usage_pages(
+            final_access_key,
+            final_secret_key,
+            final_region,
+            force_refresh,
             TimePeriod={
                 'Start': start_date,
                 'End': end_date
@@ -585,136 +702,125 @@ def get_aws_resource_usage(
                 {'Type': 'DIMENSION', 'Key': 'USAGE_TYPE'}
             ]
         )
-        return format_usage_response(response)
+        return format_usage_response(pages)
 
     except (ClientError, Exception) as e:
-        print(f"Error fetching usage from AWS: {e}")
-        if os.environ.get('FALLBACK_TO_DEMO', 'false').lower() == 'true':
+        logger.exception("Error fetching usage from AWS: %s", e)
+        if _FALLBACK_DEMO:
              return generate_mock_usage_data(start_date, end_date)
         raise e
 
-def format_usage_response(response):
-    results_by_time = response.get('ResultsByTime', [])
+def format_usage_response(pages):
+    """
+    Formats the pages of a usage response for the frontend, folding each page
+    into the per-service rows and consolidated totals as it arrives.
+    """
     formatted_data = {
         'regions': {},
         'consolidated': {}, # { "EC2": [ { "type": "t3.medium", "count": 50 } ] }
         'period': {'start': '', 'end': ''}
     }
 
-    if not results_by_time:
-        return formatted_data
-
-    formatted_data['period']['start'] = results_by_time[0]['TimePeriod']['Start']
-    formatted_data['period']['end'] = results_by_time[-1]['TimePeriod']['End']
-
-    for result in results_by_time:
+    # Usage is no longer grouped by region, so every row lands in one bucket
+    region = "Global/Linked"
+    region_services = defaultdict(list)
+    # Consolidated rows are built in their final list form; the index maps
+    # (service, component) to [row, count, cost] so repeats update in place
+    consolidated = defaultdict(list)
+    index = {}
+    to_float = float
+    for result in _iter_results_by_time(pages, formatted_data['period']):
         for group in result.get('Groups', []):
             keys = group['Keys']
             service = keys[0]
             usage_type = keys[1]
-            region = "Global/Linked" # Default since we removed REGION GroupBy
-            
+            metrics = group['Metrics']
+            usage = metrics['UsageQuantity']
+
             # Clean up usage type
             component = usage_type.split(':')[-1] if ':' in usage_type else usage_type
-            
-            usage_amount = float(group['Metrics']['UsageQuantity']['Amount'])
-            cost_amount = float(group['Metrics']['AmortizedCost']['Amount'])
-            
+        
+            usage_amount = to_float(usage['Amount'])
+            cost_amount = to_float(metrics['AmortizedCost']['Amount'])
+        
             if usage_amount == 0 and cost_amount == 0: continue
 
             # --- Region Structure ---
-            if region not in formatted_data['regions']:
-                formatted_data['regions'][region] = {}
-            if service not in formatted_data['regions'][region]:
-                formatted_data['regions'][region][service] = []
-            
-            formatted_data['regions'][region][service].append({
+            region_services[service].append({
                 'component': component,
                 'count': round(usage_amount, 2),
                 'cost': round(cost_amount, 2),
-                'unit': group['Metrics']['UsageQuantity'].get('Unit', '')
+                'unit': usage.get('Unit', '')
             })
 
             # --- Consolidated Structure ---
-            if service not in formatted_data['consolidated']:
-                formatted_data['consolidated'][service] = {}
-            
-            if component not in formatted_data['consolidated'][service]:
-                formatted_data['consolidated'][service][component] = {
-                    'count': 0.0,
-                    'cost': 0.0,
-                    'unit': group['Metrics']['UsageQuantity'].get('Unit', '')
+            entry = index.get((service, component))
+            if entry is None:
+                row = {
+                    'component': component,
+                    'count': round(usage_amount, 2),
+                    'cost': round(cost_amount, 2),
+                    'unit': usage.get('Unit', '')
                 }
-            
-            formatted_data['consolidated'][service][component]['count'] += usage_amount
-            formatted_data['consolidated'][service][component]['cost'] += cost_amount
+                consolidated[service].append(row)
+                index[(service, component)] = [row, usage_amount, cost_amount]
+            else:
+                # Sums stay unrounded; the row holds their rounded value
+                row = entry[0]
+                entry[1] += usage_amount
+                entry[2] += cost_amount
+                row['count'] = round(entry[1], 2)
+                row['cost'] = round(entry[2], 2)
 
-    # Final touch: convert consolidated dicts to lists for easier JS handling
-    final_consolidated = {}
-    for svc, components in formatted_data['consolidated'].items():
-        final_consolidated[svc] = []
-        for comp, data in components.items():
-            final_consolidated[svc].append({
-                'component': comp,
-                'count': round(data['count'], 2),
-                'cost': round(data['cost'], 2),
-                'unit': data['unit']
-            })
-    formatted_data['consolidated'] = final_consolidated
+    if region_services:
+        formatted_data['regions'][region] = dict(region_services)
+
+    formatted_data['consolidated'] = dict(consolidated)
 
     return formatted_data
 
 def generate_mock_usage_data(start_date, end_date):
-    regions = ['us-east-1', 'us-west-2', 'eu-west-1']
-    services_usage = {
-        'Amazon EC2': ['t3.medium', 't3.large', 'm5.xlarge', 'EBS:VolumeUsage (GB)'],
-        'Amazon RDS': ['db.t3.small', 'db.m5.large', 'Storage (GB)'],
-        'Amazon S3': ['StandardStorage (GB)', 'Requests-Tier1', 'DataTransfer-Out (GB)'],
-        'AWS Lambda': ['Invocations', 'Duration (GB-Seconds)']
-    }
-    
     data = {
         'regions': {},
         'consolidated': {},
         'period': {'start': start_date, 'end': end_date}
     }
     
-    for region in regions:
-        data['regions'][region] = {}
-        for service, components in services_usage.items():
-            data['regions'][region][service] = []
-            if service not in data['consolidated']:
-                data['consolidated'][service] = {}
+    # Consolidated sums are kept flat as (service, component) -> [count, cost, unit]
+    totals = {}
+    for region in _MOCK_USAGE_REGIONS:
+        region_data = data['regions'][region] = {}
+        for service, components in _MOCK_USAGE_COMPONENTS.items():
+            rows = region_data[service] = []
                 
             # Randomly pick some components for this region
-            for comp in random.sample(components, random.randint(1, len(components))):
+            for comp, unit in random.sample(components, random.randint(1, len(components))):
                 count = round(random.uniform(1, 1000), 2)
                 cost = round(random.uniform(0.1, 50), 2)
-                unit = "Units" if "GB" not in comp else "GB"
                 
-                data['regions'][region][service].append({
+                rows.append({
                     'component': comp,
                     'count': count,
                     'cost': cost,
                     'unit': unit
                 })
                 
-                if comp not in data['consolidated'][service]:
-                    data['consolidated'][service][comp] = {'count': 0, 'cost': 0, 'unit': unit}
-                data['consolidated'][service][comp]['count'] += count
-                data['consolidated'][service][comp]['cost'] += cost
-
-    # Format consolidated
+                record = totals.get((service, comp))
+                if record is None:
+                    totals[(service, comp)] = [count, cost, unit]
+                else:
+                    record[0] += count
+                    record[1] += cost
+
+    # Build the nested consolidated view once from the flat sums
     final_consolidated = {}
-    for svc, components in data['consolidated'].items():
-        final_consolidated[svc] = []
-        for comp, c_data in components.items():
-            final_consolidated[svc].append({
-                'component': comp,
-                'count': round(c_data['count'], 2),
-                'cost': round(c_data['cost'], 2),
-                'unit': c_data['unit']
-            })
+    for (svc, comp), (count, cost, unit) in totals.items():
+        final_consolidated.setdefault(svc, []).append({
+            'component': comp,
+            'count': round(count, 2),
+            'cost': round(cost, 2),
+            'unit': unit
+        })
     data['consolidated'] = final_consolidated
             
     return data
@@ -724,10 +830,10 @@ def generate_mock_daily_cost():
     Generates mock daily cost data for the last 7 days.
     """
     daily_costs = []
-    today = datetime.now()
+    today = _utc_today()
     
     for i in range(7, 0, -1):
-        date = (today - timedelta(days=i)).strftime('%Y-%m-%d')
+        date = (today - timedelta(days=i)).isoformat()
         cost = round(random.uniform(15, 45), 2)
         daily_costs.append({
             'date': date,
@@ -741,13 +847,8 @@ def generate_mock_service_cost():
     Generates mock service-wise cost data.
     """
     services = {
-        'Amazon EC2': round(random.uniform(100, 500), 2),
-        'Amazon RDS': round(random.uniform(50, 300), 2),
-        'Amazon S3': round(random.uniform(20, 150), 2),
-        'AWS Lambda': round(random.uniform(10, 100), 2),
-        'Amazon CloudFront': round(random.uniform(30, 200), 2),
-        'Amazon DynamoDB': round(random.uniform(15, 120), 2),
-        'Amazon VPC': round(random.uniform(5, 50), 2)
+        service: round(random.uniform(low, high), 2)
+        for service, low, high in _MOCK_SERVICE_COST_RANGES
     }
     
     total_cost = sum(services.values())
@@ -762,12 +863,8 @@ def generate_mock_region_cost():
     Generates mock region-wise cost data.
     """
     regions = {
-        'us-east-1': round(random.uniform(200, 600), 2),
-        'us-west-2': round(random.uniform(150, 400), 2),
-        'eu-west-1': round(random.uniform(100, 350), 2),
-        'ap-southeast-1': round(random.uniform(80, 250), 2),
-        'ap-northeast-1': round(random.uniform(60, 200), 2),
-        'eu-central-1': round(random.uniform(50, 180), 2)
+        region: round(random.uniform(low, high), 2)
+        for region, low, high in _MOCK_REGION_COST_RANGES
     }
     
     total_cost = sum(regions.values())
@@ -781,19 +878,16 @@ def generate_mock_region_service_breakdown():
     """
     Generates mock region-wise cost data with service breakdown.
     """
-    services = ['Amazon EC2', 'Amazon RDS', 'Amazon S3', 'AWS Lambda', 'Amazon CloudFront']
     regions_data = {}
     
-    regions = ['us-east-1', 'us-west-2', 'eu-west-1', 'ap-southeast-1', 'ap-northeast-1', 'eu-central-1']
-    
     total_cost = 0.0
-    for region in regions:
+    for region in _MOCK_BREAKDOWN_REGIONS:
         region_total = 0.0
         region_services = {}
         
         # Each region has 3-5 random services
         num_services = random.randint(3, 5)
-        selected_services = random.sample(services, num_services)
+        selected_services = random.sample(_MOCK_SERVICES, num_services)
         
         for service in selected_services:
             cost = round(random.uniform(10, 150), 2)
@@ -0,0 +1,174 @@
+"""
+Helpers shared by the credential verification scripts: one STS client per
+process, the clock-skew correction applied when it signs requests, and
+concurrent verification of many credential pairs.
+"""
+import boto3
+import concurrent.futures
+import contextlib
+import datetime
+import json
+import os
+import time
+from botocore.config import Config
+from email.utils import parsedate
+from unittest.mock import patch
+
+# Credentials provided by user
+ACCESS_KEY = os.environ.get("AWS_ACCESS_KEY_ID")
+SECRET_KEY = os.environ.get("AWS_SECRET_ACCESS_KEY")
+
+_sts = None
+
+# One attempt per call: a skewed clock fails the same way every time, so
+# retrying only delays the correction path. Short timeouts for the same reason.
+_STS_CONFIG = Config(
+    retries={'total_max_attempts': 1, 'mode': 'standard'},
+    connect_timeout=3,
+    read_timeout=5
+)
+
+# How far the local clock runs ahead of AWS, once calibrated. Kept for the
+# rest of the process so later calls do not have to rediscover it.
+_clock_offset = None
+
+# A calibrated offset is saved here so later runs can skip calibration.
+# Skew drifts slowly, but not so slowly that an old measurement can be trusted.
+SKEW_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "aws-bill-app", "skew.json")
+SKEW_CACHE_TTL = 3600  # seconds
+
+# SigV4 accepts signatures up to five minutes off, so skew below this is left
+# alone and the signer runs on the real clock with nothing patched
+MIN_CORRECTED_SKEW = datetime.timedelta(seconds=60)
+
+def get_sts_client():
+    """Returns the process-wide STS client, creating it on first use."""
+    global _sts
+    if _sts is None:
+        session = boto3.Session(
+            aws_access_key_id=ACCESS_KEY,
+            aws_secret_access_key=SECRET_KEY,
+            region_name="us-east-1"
+        )
+        _sts = session.client('sts', config=_STS_CONFIG)
+    return _sts
+
+def verify_many(pairs, max_workers=8):
+    """
+    Calls GetCallerIdentity for each (access_key, secret_key) pair, up to
+    max_workers at a time. Returns one entry per pair, in order: the identity
+    response, or the exception the call raised.
+    """
+    def verify(pair):
+        access_key, secret_key = pair
+        try:
+            sts = boto3.Session(
+                aws_access_key_id=access_key,
+                aws_secret_access_key=secret_key,
+                region_name="us-east-1"
+            ).client('sts', config=_STS_CONFIG)
+            return sts.get_caller_identity()
+        except Exception as e:
+            return e
+
+    # The signing clock is patched once around the whole batch; patching it
+    # from each worker would race on the shared module attribute
+    with signing_clock(), concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(verify, pairs))
+
+def get_aws_time_from_error(error):
+    """
+    Reads AWS's clock from the Date header of a failed signed request. This is
+    the time of the service that rejected the signature, and costs no extra
+    round trip. Returns None if the error carries no HTTP response.
+    """
+    headers = getattr(error, 'response', {}).get('ResponseMetadata', {}).get('HTTPHeaders', {})
+    date_str = headers.get('date')
+    if not date_str:
+        return None
+    return parse_http_date(date_str)
+
+def parse_http_date(date_str):
+    """
+    Parses an HTTP Date header (e.g. "Sun, 08 Feb 2026 17:48:00 GMT") into a
+    naive UTC datetime, or None if it cannot be read.
+    """
+    # HTTP dates are always GMT, so the zone is not examined: the date fields
+    # go straight into datetime, skipping parsedate_to_datetime's tz handling
+    fields = parsedate(date_str)
+    if fields is None:
+        return None
+    # parsedate checks the format but not the ranges, e.g. day 45
+    try:
+        return datetime.datetime(*fields[:6])
+    except ValueError:
+        return None
+
+def shifted_clock(offset):
+    """
+    Returns a stand-in for botocore.auth.get_current_datetime that runs
+    `offset` behind the local clock. SigV4 signing reads the request time
+    from that function (after the before-sign event has fired), so patching
+    it alone corrects X-Amz-Date without touching datetime or time globally.
+    """
+    # Converted once to whole nanoseconds, so each call shifts the clock with
+    # integer math on time.time_ns() instead of datetime - timedelta
+    offset_ns = offset // datetime.timedelta(microseconds=1) * 1000
+
+    def get_current_datetime(remove_tzinfo=True):
+        now = datetime.datetime.fromtimestamp(
+            (time.time_ns() - offset_ns) / 1e9,
+            datetime.timezone.utc
+        )
+        return now.replace(tzinfo=None) if remove_tzinfo else now
+
+    return get_current_datetime
+
+def set_clock_offset(offset):
+    """Caches the calibrated offset for every later signing_clock() block."""
+    global _clock_offset
+    _clock_offset = offset
+
+def get_clock_offset():
+    return _clock_offset
+
+def signing_clock():
+    """
+    Context manager under which requests are signed with the cached offset
+    applied. Does nothing until an offset has been calibrated, or when it is
+    under MIN_CORRECTED_SKEW.
+    """
+    if _clock_offset is None or abs(_clock_offset) < MIN_CORRECTED_SKEW:
+        return contextlib.nullcontext()
+    return patch('botocore.auth.get_current_datetime', new=shifted_clock(_clock_offset))
+
+def load_cached_offset():
+    """
+    Returns the offset saved by an earlier run, or None if there is none or it
+    is older than SKEW_CACHE_TTL.
+    """
+    try:
+        with open(SKEW_CACHE_PATH) as f:
+            cached = json.load(f)
+        age = time.time() - cached['computed_at']
+        offset = datetime.timedelta(seconds=cached['offset_seconds'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    # A negative age means the local clock was set back since it was saved
+    if not 0 <= age < SKEW_CACHE_TTL:
+        return None
+    return offset
+
+def save_cached_offset(offset):
+    """
+    Saves a calibrated offset for later runs. Written to a temporary file and
+    renamed into place, so a concurrent reader never sees a partial file.
+    """
+    tmp_path = f"{SKEW_CACHE_PATH}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(SKEW_CACHE_PATH), exist_ok=True)
+        with open(tmp_path, 'w') as f:
+            json.dump({'computed_at': time.time(), 'offset_seconds': offset.total_seconds()}, f)
+        os.replace(tmp_path, SKEW_CACHE_PATH)
+    except OSError as e:
+        print(f"Could not cache the clock offset: {e}")
@@ -1,38 +1,105 @@
-import sys
 import datetime
-import time
-import urllib.request
-import os
-from unittest.mock import patch
+import http.client
+from verify_common import (
+    MIN_CORRECTED_SKEW,
+    SKEW_CACHE_PATH,
+    get_aws_time_from_error,
+    get_clock_offset,
+    get_sts_client,
+    parse_http_date,
+    load_cached_offset,
+    save_cached_offset,
+    set_clock_offset,
+    signing_clock
+)
 
-# Credentials
-ACCESS_KEY = os.environ.get("AWS_ACCESS_KEY_ID")
-SECRET_KEY = os.environ.get("AWS_SECRET_ACCESS_KEY")
+try:
+    import ntplib  # optional: pip install ntplib
+except ImportError:
+    ntplib = None
+
+# Amazon's public NTP service
+NTP_SERVER = "time.aws.com"
+
+# Public AWS endpoint whose Date header is the last-resort time source
+AWS_TIME_HOST = "aws.amazon.com"
+_aws_time_conn = None
+
+def get_ntp_offset():
+    """
+    Asks time.aws.com how far the local clock runs ahead of AWS. Returns None
+    if ntplib is not installed or the server does not answer.
+    """
+    if ntplib is None:
+        return None
+    try:
+        response = ntplib.NTPClient().request(NTP_SERVER, version=3, timeout=2)
+    except Exception as e:
+        print(f"Failed to query {NTP_SERVER}: {e}")
+        return None
+    # ntplib reports how far the server is ahead of the local clock
+    return datetime.timedelta(seconds=-response.offset)
 
 def get_real_aws_time():
     """Fetches the Date header from an AWS endpoint to get real server time."""
+    global _aws_time_conn
     try:
-        # Use a public AWS endpoint that returns a Date header
-        url = "https://aws.amazon.com"
-        with urllib.request.urlopen(url) as response:
-            date_str = response.headers['Date']
-            # Parse Date: Sun, 08 Feb 2026 17:48:00 GMT
-            # We need to parse this manually or use email.utils
-            from email.utils import parsedate_to_datetime
-            aws_time = parsedate_to_datetime(date_str)
-            # Make sure it's offset-naive UTC for comparison if needed, or keep as is
-            return aws_time.replace(tzinfo=None) # simplistic, assuming parsing gave us UTC-like
+        # HEAD carries the same Date header without the page body, and the
+        # connection is kept so a repeat calibration skips the TLS handshake
+        if _aws_time_conn is None:
+            _aws_time_conn = http.client.HTTPSConnection(AWS_TIME_HOST, timeout=5)
+        _aws_time_conn.request("HEAD", "/")
+        response = _aws_time_conn.getresponse()
+        response.read()
+        return parse_http_date(response.headers['Date'])
     except Exception as e:
         print(f"Failed to fetch AWS time: {e}")
+        if _aws_time_conn is not None:
+            _aws_time_conn.close()
+            _aws_time_conn = None
         return None
 
 def verify_with_offset():
     print("--- Advanced Credential Verification ---")
     
-    # 1. Calculate Offset
-    print("1. Calculating Time Offset...")
-    system_time = datetime.datetime.utcnow()
-    aws_time = get_real_aws_time()
+    sts = get_sts_client()
+    
+    # 1. Reuse the offset from a recent run if there is one. Otherwise, with
+    # ntplib installed, calibrate once against time.aws.com so the first
+    # request is already signed with AWS's time. Failing both, try as-is; a
+    # skewed clock fails here, and the error response carries AWS's own Date
+    # header to calibrate against.
+    print("1. Sending GetCallerIdentity request...")
+    cached_offset = load_cached_offset()
+    ntp_offset = None if cached_offset is not None else get_ntp_offset()
+    if cached_offset is not None:
+        print(f"   Signing with the offset cached in {SKEW_CACHE_PATH}: {cached_offset}")
+        set_clock_offset(cached_offset)
+    elif ntp_offset is not None:
+        if abs(ntp_offset) < MIN_CORRECTED_SKEW:
+            print(f"   Clock is within {MIN_CORRECTED_SKEW} of {NTP_SERVER}; no correction needed")
+        else:
+            print(f"   Signing with the offset from {NTP_SERVER}: {ntp_offset}")
+        set_clock_offset(ntp_offset)
+    try:
+        with signing_clock():
+            identity = sts.get_caller_identity()
+        # Only a fresh measurement is saved, so the cache still expires
+        if ntp_offset is not None:
+            save_cached_offset(ntp_offset)
+        print_identity(identity)
+        return True
+    except Exception as e:
+        print(f"   Request failed: {e}")
+        system_time = datetime.datetime.utcnow()
+        aws_time = get_aws_time_from_error(e)
+    
+    # 2. Calculate Offset
+    print("2. Calculating Time Offset...")
+    if not aws_time:
+        print("   No Date header in the error response. Asking aws.amazon.com instead.")
+        system_time = datetime.datetime.utcnow()
+        aws_time = get_real_aws_time()
     
     if not aws_time:
         print("Could not determine AWS time. Using hardcoded offset estimate.")
@@ -40,73 +107,30 @@ def verify_with_offset():
         aws_time = system_time - datetime.timedelta(hours=5, minutes=15)
         
     offset = system_time - aws_time
+    set_clock_offset(offset)
     print(f"   System Time (UTC): {system_time}")
     print(f"   AWS Time (approx): {aws_time}")
     print(f"   Calculated Offset: {offset}")
     
-    # 2. Define Patches
-    # We need to shift "now" back by `offset`.
+    print("3. Retrying with the corrected signing clock...")
     
-    class MockDatetime(datetime.datetime):
-        @classmethod
-        def utcnow(cls):
-            return datetime.datetime.fromtimestamp(time.time() - offset.total_seconds()).utcfromtimestamp(time.time() - offset.total_seconds())
-            # simpler:
-            real_now = super().utcnow()
-            return real_now - offset
-
-        @classmethod
-        def now(cls, tz=None):
-            real_now = super().now(tz)
-            return real_now - offset
+    # Shift only the clock botocore's signer reads; nothing else in the
+    # process sees the offset
+    with signing_clock():
+        try:
+            identity = sts.get_caller_identity()
+            save_cached_offset(get_clock_offset())
+            print_identity(identity)
+            return True
+        except Exception as e:
+            print(f"\n❌ Verification Failed: {e}")
+            return False
 
-    # We also need to patch time.time() because boto might use it for epoch
-    original_time = time.time
-    def mock_time():
-        return original_time() - offset.total_seconds()
-        
-    # 3. Apply Patches BEFORE importing boto3 (if possible, but we import inside)
-    # Since we already imported standard libs, we patch them.
-    
-    print("2. applying Patches and Connecting...")
-    
-    # Patching datetime.datetime is hard because it's a C extension type.
-    # We have to patch it where it is imported or used.
-    # But patching 'time.time' is easier.
-    
-    with patch('time.time', side_effect=mock_time):
-        with patch('datetime.datetime', MockDatetime):
-            # We also need to patch botocore's usage of datetime if it imported it directly
-            # It usually does: from datetime import datetime
-            
-            # IMPORTS INSIDE PATCH BLOCK
-            import boto3
-            import botocore.auth
-            import botocore.utils
-            
-            # Manually patch botocore's datetime reference if it exists
-            if hasattr(botocore.auth, 'datetime'):
-                botocore.auth.datetime = MockDatetime
-            
-            session = boto3.Session(
-                aws_access_key_id=ACCESS_KEY,
-                aws_secret_access_key=SECRET_KEY,
-                region_name="us-east-1"
-            )
-            
-            sts = session.client('sts')
-            
-            try:
-                print("   Sending GetCallerIdentity request...")
-                identity = sts.get_caller_identity()
-                print("\n✅ CREDENTIALS VERIFIED!")
-                print(f"   Arn: {identity['Arn']}")
-                print(f"   Account: {identity['Account']}")
-                print(f"   UserId: {identity['UserId']}")
-                return True
-            except Exception as e:
-                print(f"\n❌ Verification Failed: {e}")
-                return False
+def print_identity(identity):
+    print("\n✅ CREDENTIALS VERIFIED!")
+    print(f"   Arn: {identity['Arn']}")
+    print(f"   Account: {identity['Account']}")
+    print(f"   UserId: {identity['UserId']}")
 
 if __name__ == "__main__":
     verify_with_offset()
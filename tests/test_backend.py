@@ -1,6 +1,7 @@
 import httpx
 import asyncio
 import logging
+import sys
 from datetime import datetime, timedelta
 
 # Configure logging
@@ -9,76 +10,110 @@ logger = logging.getLogger(__name__)
 
 BASE_URL = "http://localhost:8000"
 
-async def test_backend():
-    async with httpx.AsyncClient(base_url=BASE_URL, timeout=10.0) as client:
-        # 1. Health Check
-        logger.info("Testing /health...")
-        response = await client.get("/health")
-        assert response.status_code == 200
-        assert response.json() == {"status": "ok"}
-        logger.info("✅ /health passed")
-
-        # Prepare headers for demo mode
-        headers = {"x-use-demo-data": "true"}
-        
-        # Date range for testing
-        end_date = datetime.now().strftime("%Y-%m-%d")
-        start_date = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
-        params = {"start_date": start_date, "end_date": end_date}
-
-        # 2. Daily Cost
-        logger.info("Testing /daily-cost...")
-        response = await client.get("/daily-cost", headers=headers, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            assert "daily_costs" in data
-            logger.info(f"✅ /daily-cost passed with {len(data['daily_costs'])} records")
-        else:
-            logger.error(f"❌ /daily-cost failed: {response.status_code} - {response.text}")
-
-        # 3. Service Cost
-        logger.info("Testing /service-cost...")
-        response = await client.get("/service-cost", headers=headers, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            assert "services" in data
-            logger.info(f"✅ /service-cost passed with {len(data['services'])} services")
-        else:
-            logger.error(f"❌ /service-cost failed: {response.status_code} - {response.text}")
-
-        # 4. Region Cost
-        logger.info("Testing /region-cost...")
-        response = await client.get("/region-cost", headers=headers, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            assert "regions" in data
-            logger.info(f"✅ /region-cost passed with {len(data['regions'])} regions")
-        else:
-            logger.error(f"❌ /region-cost failed: {response.status_code} - {response.text}")
-
-        # 5. Region Service Breakdown
-        logger.info("Testing /region-service-breakdown...")
-        response = await client.get("/region-service-breakdown", headers=headers, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            assert "regions" in data
-            logger.info("✅ /region-service-breakdown passed")
-        else:
-            logger.error(f"❌ /region-service-breakdown failed: {response.status_code} - {response.text}")
-
-        # 6. Usage API
-        logger.info("Testing /api/usage...")
-        response = await client.get("/api/usage", headers=headers, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            assert "regions" in data
-            assert "consolidated" in data
-            logger.info("✅ /api/usage passed")
-        else:
-            logger.error(f"❌ /api/usage failed: {response.status_code} - {response.text}")
+# (path, section in the /api/bulk response, keys the payload must contain,
+#  key whose length is reported)
+ENDPOINTS = [
+    ("/daily-cost", "daily_cost", ("daily_costs",), "daily_costs"),
+    ("/service-cost", "service_cost", ("services",), "services"),
+    ("/region-cost", "region_cost", ("regions",), "regions"),
+    ("/region-service-breakdown", "region_service_breakdown", ("regions",), None),
+    ("/api/usage", "usage", ("regions", "consolidated"), None),
+]
+
+# One keep-alive connection per concurrent probe at most; the health check's
+# connection is reused by the first of them
+LIMITS = httpx.Limits(
+    max_connections=len(ENDPOINTS),
+    max_keepalive_connections=len(ENDPOINTS)
+)
+
+# Shared by every test_backend() call on the same event loop, so repeated runs
+# reuse its keep-alive connections. Created on first use; close_client() ends it.
+_client = None
+
+def get_client():
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(base_url=BASE_URL, timeout=10.0, limits=LIMITS)
+    return _client
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+# Each check returns one result line instead of logging as it goes; the lines
+# are reported together once the run is over, so concurrent probes cannot
+# interleave their output
+def check_payload(name, data, required_keys, counted_key):
+    for key in required_keys:
+        assert key in data
+    if counted_key:
+        return f"✅ {name} passed with {len(data[counted_key])} {counted_key}"
+    return f"✅ {name} passed"
+
+async def check_endpoint(client, path, required_keys, counted_key, headers, params):
+    response = await client.get(path, headers=headers, params=params)
+    if response.status_code == 200:
+        return [check_payload(path, response.json(), required_keys, counted_key)]
+    return [f"❌ {path} failed: {response.status_code} - {response.text}"]
+
+async def check_bulk(client, headers, params):
+    response = await client.get("/api/bulk", headers=headers, params=params)
+    if response.status_code == 200:
+        data = response.json()
+        return [
+            check_payload(f"/api/bulk [{section}]", data[section], required_keys, counted_key)
+            for path, section, required_keys, counted_key in ENDPOINTS
+        ]
+    return [f"❌ /api/bulk failed: {response.status_code} - {response.text}"]
+
+async def test_backend(each=False):
+    client = get_client()
+
+    # 1. Health Check
+    response = await client.get("/health")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+    results = ["✅ /health passed"]
+
+    # Prepare headers for demo mode
+    headers = {"x-use-demo-data": "true"}
+    
+    # Date range for testing
+    end_date = datetime.now().strftime("%Y-%m-%d")
+    start_date = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
+    params = {"start_date": start_date, "end_date": end_date}
+
+    # 2. All data sections in one round trip
+    results += await check_bulk(client, headers, params)
+
+    # 3. Optionally probe each endpoint on its own as well; they are
+    # independent reads, so run them concurrently
+    if each:
+        for lines in await asyncio.gather(*(
+            check_endpoint(client, path, required_keys, counted_key, headers, params)
+            for path, _, required_keys, counted_key in ENDPOINTS
+        )):
+            results += lines
+
+    failed = sum(line.startswith("❌") for line in results)
+    summary = f"{len(results) - failed}/{len(results)} checks passed\n" + "\n".join(results)
+    if failed:
+        logger.error(summary)
+    else:
+        logger.info(summary)
+
+async def main(each):
+    try:
+        await test_backend(each=each)
+    finally:
+        await close_client()
 
 if __name__ == "__main__":
     try:
-        asyncio.run(test_backend())
+        # --each also probes every endpoint individually
+        asyncio.run(main(each="--each" in sys.argv[1:]))
     except Exception as e:
         logger.error(f"Test execution failed: {e}")